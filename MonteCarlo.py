@@ -0,0 +1,89 @@
+import numpy as np
+from numba import njit, prange
+from PulseShaper import PulseShaper, _sparse_pulseshape
+from TimingErrorDetector import TimingErrorDetector, TEDMethod, _ted_method, _run_mueller, _run_gardner, _run_earlylategate
+
+@njit(fastmath=True, cache=True)
+def _ted_one_trial(seed: int, num_symbols: int, sps: int, rc: np.ndarray[np.float64], sinc: np.ndarray[np.float64], int_delay: int, snr: float, is_complex: bool, poly: np.ndarray[np.float64], upsample: int, method_id: int, shift: int, gain: float, Kp: float, Ki: float, use_pi: bool, skip: int):
+    # Returns (ber, final_offset) of one full simulation: symbols, pulse shaping, delay, noise and the TED loop
+    # Same chain as SymbolGenerator -> PulseShaper -> TimingErrorDetector, with the interpolation applied on demand by the TED loop
+    # seed: seeds Numba's random state of the thread running this trial
+    # sinc: fractional delay filter, a single tap of one when there is no fractional delay
+    # skip: number of leading symbols left out of the BER, the preamble
+    np.random.seed(seed)
+    symbols = np.empty(num_symbols, dtype=np.int8)
+    for k in range(num_symbols):
+        symbols[k] = 2 * np.random.randint(0, 2) - 1
+
+    n = num_symbols * sps
+    shaped = np.zeros(n + len(rc) - 1)
+    _sparse_pulseshape(symbols, rc, sps, shaped)
+    delayed = np.zeros(n)
+    delayed[int_delay:] = shaped[(len(rc) - 1) // 2 : (len(rc) - 1) // 2 + n - int_delay] # Trimmed pulse shape, integer delayed and zero padded
+    delayed = np.convolve(delayed, sinc)[(len(sinc) - 1) // 2 : (len(sinc) - 1) // 2 + n]
+
+    pulse_power = 0.0
+    for i in range(n):
+        pulse_power += delayed[i] * delayed[i]
+    variance = pulse_power / n / (10**(snr / 10))
+    signal = np.empty(n, dtype=np.complex128)
+    if is_complex:
+        std = np.sqrt(variance / 2)
+        for i in range(n):
+            signal[i] = delayed[i] + std * (np.random.standard_normal() + 1j * np.random.standard_normal())
+    else:
+        std = np.sqrt(variance)
+        for i in range(n):
+            signal[i] = delayed[i] + std * np.random.standard_normal()
+
+    n_iter = (n - 1) // sps
+    error = np.empty(1) # Only the latest error, offset and sample are kept, the trial needs the decisions and final offset
+    offset = np.empty(1)
+    symbols_pred = np.zeros(n_iter + 1, dtype=np.int8)
+    out_signal = np.empty(1, dtype=np.complex128)
+    if method_id == TEDMethod.MUELLER:
+        _run_mueller(signal, poly, upsample, sps, shift, 0.0, gain, Kp, Ki, use_pi, 0.0, error, offset, symbols_pred, out_signal)
+    elif method_id == TEDMethod.GARDNER:
+        _run_gardner(signal, poly, upsample, sps, shift, 0.0, gain, Kp, Ki, use_pi, 0.0, error, offset, symbols_pred, out_signal)
+    else:
+        _run_earlylategate(signal, poly, upsample, sps, shift, 0.0, gain, Kp, Ki, use_pi, 0.0, error, offset, symbols_pred, out_signal)
+
+    num_correct = 0
+    for k in range(skip, num_symbols):
+        if symbols_pred[k] == symbols[k]:
+            num_correct += 1
+    ber = (num_symbols - skip - num_correct) / (num_symbols - skip) * 100
+    return ber, offset[-1]
+
+@njit(parallel=True, cache=True)
+def _run_trials(seeds: np.ndarray[np.int64], snr_db: np.ndarray[np.float64], num_symbols: int, sps: int, rc: np.ndarray[np.float64], sinc: np.ndarray[np.float64], int_delay: int, is_complex: bool, poly: np.ndarray[np.float64], upsample: int, method_id: int, shift: int, gain: float, Kp: float, Ki: float, use_pi: bool, skip: int, ber: np.ndarray[np.float64], final_offset: np.ndarray[np.float64]):
+    # Fills ber and final_offset, of shape (len(snr_db), trials), running every (snr, trial) pair in parallel
+    num_snr, trials = seeds.shape
+    for j in prange(num_snr * trials):
+        i = j // trials
+        t = j - i * trials
+        ber[i, t], final_offset[i, t] = _ted_one_trial(seeds[i, t], num_symbols, sps, rc, sinc, int_delay, snr_db[i], is_complex, poly, upsample, method_id, shift, gain, Kp, Ki, use_pi, skip)
+
+def run_trials(trials: int, snr_db: np.ndarray[np.float64], method: str | TEDMethod, pulse: PulseShaper, ted: TimingErrorDetector, num_symbols: int, is_complex: bool = True, keep_all: bool = False, gain: float = 0.1, Kp: float = 0.01, Ki: float = 0.0001, delta: int = 4, use_pi: bool = False, rng: int | np.random.Generator | None = None):
+    # Returns (ber, final_offset), each numpy.ndarray[numpy.float64] of shape (len(snr_db), trials), BER in percent
+    # Runs independent Monte-Carlo trials of the whole simulation for every SNR, in parallel across all cores
+    # Every trial draws new symbols and noise. Trials are reproducible through rng, but do not reproduce SymbolGenerator/PulseShaper draws
+    # trials: number of trials per SNR
+    # snr_db: signal to noise ratios to simulate
+    # method: selection of the error equation. Choose from ['mueller', 'gardner', 'earlylategate] or the matching TEDMethod
+    # pulse: provides sps, the raised cosine and the delay settings
+    # ted: provides upsample and the interpolation filter bank
+    # num_symbols: number of symbols per trial
+    # is_complex: controls if AWGN is complex valued
+    # keep_all: if false, skip the first 30 predicted symbols, considered as a preamble for bit syncing
+    # gain, Kp, Ki, delta, use_pi: loop settings, as in TimingErrorDetector.main
+    # rng: seed or numpy Generator used to seed the trials
+    snr_db = np.asarray(snr_db, dtype=np.float64)
+    children = np.random.default_rng(rng).bit_generator.seed_seq.spawn(len(snr_db) * trials) # Independent child streams of rng, as Generator.spawn
+    seeds = np.array([child.generate_state(1)[0] for child in children], dtype=np.int64).reshape(len(snr_db), trials) # One seed per trial, independent of which thread runs it
+    ber = np.empty((len(snr_db), trials))
+    final_offset = np.empty((len(snr_db), trials))
+    sinc = pulse.sinc_delay if pulse.sinc_delay is not None else np.ones(1)
+    shift = (pulse.sps * ted.upsample) // delta
+    _run_trials(seeds, snr_db, num_symbols, pulse.sps, pulse.raised_cosine, sinc, pulse.int_delay or 0, is_complex, ted._poly, ted.upsample, int(_ted_method(method)), shift, gain, Kp, Ki, use_pi, 0 if keep_all else 30, ber, final_offset)
+    return ber, final_offset
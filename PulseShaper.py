@@ -1,9 +1,71 @@
+import functools
 import numpy as np
-import matplotlib.pyplot as plt
-import commpy
+from scipy.signal import oaconvolve
+from numba import njit
+from plotting import _axes
+
+_FFT_CONVOLVE_TAPS = 128 # Filter length from which overlap-add FFT convolution beats direct np.convolve
+_FFT_PULSESHAPE_TAPS_PER_SYMBOL = 32 # Raised cosine taps per symbol from which overlap-add FFT convolution beats the sparse pulse shaping kernel
+
+def _convolve(signal: np.ndarray[np.float64], taps: np.ndarray[np.float64]):
+    # Returns numpy.ndarray[np.float64] full convolution of signal with taps, of shape (len(signal) + len(taps)-1,)
+    # Direct convolution for short filters, overlap-add FFT convolution for long ones
+    if len(taps) >= _FFT_CONVOLVE_TAPS:
+        return oaconvolve(signal, taps)
+    return np.convolve(signal, taps)
+
+@njit(cache=True)
+def _sparse_pulseshape(symbols: np.ndarray[np.int8], pulse: np.ndarray[np.float64], sps: int, out: np.ndarray[np.float64]):
+    # Accumulates into out, of shape (len(symbols)*sps + len(pulse) - 1,), one copy of pulse per symbol spaced sps samples apart
+    # Same result as convolving pulse with the zero stuffed pulse train, without multiplying the sps - 1 zeros between symbols
+    # symbols: BPSK symbols {-1,+1}, one per symbol period. Each pulse is added or subtracted, no multiplies
+    # pulse: pulse shape placed at every symbol
+    # sps: samples per symbol
+    for k in range(len(symbols)):
+        start = k * sps
+        if symbols[k] > 0:
+            for j in range(len(pulse)):
+                out[start + j] += pulse[j]
+        else:
+            for j in range(len(pulse)):
+                out[start + j] -= pulse[j]
+
+@njit(fastmath=True, cache=True)
+def _scale_add(noise: np.ndarray[np.float64] | np.ndarray[np.complex128], std: float, clean: np.ndarray[np.float64]):
+    # Turns noise, of shape (clean,), into clean + std * noise in place with a single pass over both arrays
+    # noise: unit variance noise draws
+    # std: standard deviation to scale the noise to, same precision as noise so float32 signals are not computed in float64
+    # clean: noiseless signal
+    for i in range(len(noise)):
+        noise[i] = noise[i] * std + clean[i]
+
+@functools.lru_cache(maxsize=16)
+def _make_rc(rc_taps: int, rolloff: float, sps: int):
+    # Returns (raised_cosine, zero_crossings), read-only numpy.ndarray of shapes (rc_taps,) and the zero crossing indexes
+    # Memoized, sweeps creating many PulseShaper objects with the same parameters build the raised cosine once
+    # Vectorized closed form of the raised cosine, matches commpy.rcosfilter(rc_taps + 1, rolloff, sps, 1)[1][1:]
+    t = (np.arange(rc_taps) - (rc_taps - 1) / 2) / sps # Time in symbol periods, centered on the middle tap
+    denom = 1 - (2 * rolloff * t)**2
+    singular = np.abs(denom) < 1e-8 # t = +-1/(2*rolloff), where the closed form is 0/0
+    raised_cosine = np.where(singular, (np.pi / 4) * np.sinc(t), np.sinc(t) * np.cos(np.pi * rolloff * t) / np.where(singular, 1.0, denom))
+    zero_crossings = np.concatenate((np.flip(np.arange(rc_taps//2 - sps, -1, -sps)), np.arange(rc_taps//2, rc_taps, sps))) # Index positions of RC crossing zero and peak
+    zero_crossings = np.delete(zero_crossings, len(zero_crossings)//2)
+    raised_cosine.setflags(write=False)
+    zero_crossings.setflags(write=False)
+    return raised_cosine, zero_crossings
+
+@functools.lru_cache(maxsize=16)
+def _make_sinc(frac_delay: float, sinc_taps: int):
+    # Returns read-only numpy.ndarray[np.float64] Hamming windowed sinc fractional delay filter, of shape (sinc_taps,)
+    # Memoized like _make_rc, sweeps creating many PulseShaper objects with the same delay build the filter once
+    n = np.arange(-(sinc_taps-1)//2, sinc_taps//2 + 1) #  np.sinc() centers at index 0, so need positive and negative indexes
+    sinc_delay = np.sinc(n - frac_delay) * np.hamming(sinc_taps) # Sinc with sample delay and windowed
+    sinc_delay /= np.sum(sinc_delay) # Will maintain signal amplitude
+    sinc_delay.setflags(write=False)
+    return sinc_delay
 
 class PulseShaper:
-    def __init__(self, rc_taps: int, rolloff: float, sps: int, int_delay: int | None = None, frac_delay: float | None = None, sinc_taps: int | None = None, snr: float | None = None):
+    def __init__(self, rc_taps: int, rolloff: float, sps: int, int_delay: int | None = None, frac_delay: float | None = None, sinc_taps: int | None = None, snr: float | None = None, rng: int | np.random.Generator | None = None, dtype: type = np.float64):
         # rc_taps: number of taps for raised cosine (odd numbered)
         # rolloff: controls raised cosine oscillations towards zero. Larger rolloff, faster rolloff
         # sps: samples per symbol
@@ -11,6 +73,9 @@ class PulseShaper:
         # frac_delay: decimal value of sampels to delay pulses (0.0, 1.0)
         # sinc_taps: number of taps for sinc used for delay
         # snr: desired signals to noise ratio for noisy signal
+        # rng: seed or numpy Generator used to draw the noise
+        # dtype: float type of the filters and signals, np.float32 halves memory traffic and doubles SIMD width (complex noise becomes complex64)
+        self.dtype = np.dtype(dtype)
         self.rc_taps = rc_taps
         self.rolloff = rolloff
         self.sps = sps
@@ -18,43 +83,55 @@ class PulseShaper:
         self.int_delay = int_delay
         self.frac_delay = frac_delay
         self.sinc_taps = sinc_taps
+        self.createsinc()
         self.snr = snr
+        self._rng = np.random.default_rng(rng)
 
     def createrc(self):
         # Returns numpy.ndarray[np.float64] raised cosine, of shape (rc_taps,)
         # Also creates attribute zero_crossings indicating positions the raised cosine crosses the x-axis
-        _, raised_cosine = commpy.rcosfilter(self.rc_taps + 1, self.rolloff, self.sps, 1) # Note: Need to do number of taps + 1 and then delete first element to get an odd number of taps with the center element symmetric. No, I don't know why this is the case
-        self.raised_cosine = raised_cosine[1:]
-        zero_crossings = np.concatenate((np.flip(np.arange(self.rc_taps//2 - self.sps, -1, -self.sps)), np.arange(self.rc_taps//2, self.rc_taps, self.sps))) # Index positions of RC crossing zero and peak
-        self.zero_crossings = np.delete(zero_crossings, len(zero_crossings)//2)
+        raised_cosine, self.zero_crossings = _make_rc(self.rc_taps, self.rolloff, self.sps) # Shared, read-only arrays for repeated parameters
+        self.raised_cosine = raised_cosine.astype(self.dtype, copy=False)
         return self.raised_cosine
+
+    def createsinc(self):
+        # Returns numpy.ndarray[np.float64] windowed sinc fractional delay filter, of shape (sinc_taps,)
+        # Returns None when there is no fractional delay, fractionaldelay then skips the convolution
+        if not self.frac_delay:
+            self.sinc_delay = None
+            return self.sinc_delay
+        self.sinc_delay = _make_sinc(self.frac_delay, self.sinc_taps).astype(self.dtype, copy=False) # Shared, read-only array for repeated parameters
+        return self.sinc_delay
     
-    def pulseshaping(self, pulses: np.ndarray[np.float64], keep_edges: bool = False):
-        # Returns numpy.ndarray[np.float64] of pulses convolved with a raised cosine
+    def pulseshaping(self, symbols: np.ndarray[np.int8], keep_edges: bool = False):
+        # Returns numpy.ndarray[np.float64] of the symbol pulse train convolved with a raised cosine
         # Output shape dependent on keep_edges.
-        # If False, discard transient values froms convolution, shape is (len(pulses),)
-        # If True, shape is (len(pulses) + rc_taps-1,)
-        # pulses: pulse train of symbols
+        # If False, discard transient values froms convolution, shape is (len(symbols)*sps,)
+        # If True, shape is (len(symbols)*sps + rc_taps-1,)
+        # symbols: sequence of BPSK symbols {-1,+1}, one per symbol period (the pulse train without its sps-1 zeros between symbols)
         # keep_edges: indicator of whether to keep extra values from convolution that did not align with center of raised cosine
-        self.pulse_shaped = np.convolve(pulses, self.raised_cosine)
+        if self.rc_taps >= _FFT_PULSESHAPE_TAPS_PER_SYMBOL * self.sps: # Sparse kernel costs rc_taps/sps multiplies per sample, FFT cost does not grow with rc_taps
+            pulse_train = np.zeros(len(symbols) * self.sps, dtype=self.dtype)
+            pulse_train[::self.sps] = symbols
+            self.pulse_shaped = oaconvolve(pulse_train, self.raised_cosine)
+        else:
+            self.pulse_shaped = np.zeros(len(symbols) * self.sps + self.rc_taps - 1, dtype=self.dtype)
+            _sparse_pulseshape(symbols, self.raised_cosine, self.sps, self.pulse_shaped) # Only the symbol positions of the pulse train are nonzero
         if not keep_edges:
             self.pulse_shaped = self.pulse_shaped[(self.rc_taps - 1) // 2 : -(self.rc_taps - 1) // 2]
         return self.pulse_shaped
     
     def fractionaldelay(self, keep_edges: bool = False):
         # Returns numpy.ndarray[numpy.float64] delayed pulses of shape (pulse_shaped,)
-        # Note: Summation of int_delay and frac_delay gives full delay
+        # Note: Summation of int_delay and frac_delay gives full delay. Call createsinc again after changing frac_delay or sinc_taps
         # keep_edges: indicator of whether to keep extra values from convolution that did not align with center of sinc
         if self.int_delay:
-            pulse_shaped_int_delayed = np.concatenate((np.zeros(self.int_delay), self.pulse_shaped[:-self.int_delay])) # Integer delay, zero padded
+            pulse_shaped_int_delayed = np.concatenate((np.zeros(self.int_delay, dtype=self.dtype), self.pulse_shaped[:-self.int_delay])) # Integer delay, zero padded
         else:
             pulse_shaped_int_delayed = self.pulse_shaped
         
-        if self.frac_delay:
-            n = np.arange(-(self.sinc_taps-1)//2, self.sinc_taps//2 + 1) #  np.sinc() centers at index 0, so need positive and negative indexes
-            sinc_delay = np.sinc(n - self.frac_delay) * np.hamming(self.sinc_taps) # Sinc with sample delay and windowed
-            sinc_delay /= np.sum(sinc_delay) # Will maintain signal amplitude
-            self.pulse_shaped_delayed = np.convolve(pulse_shaped_int_delayed, sinc_delay)
+        if self.sinc_delay is not None:
+            self.pulse_shaped_delayed = _convolve(pulse_shaped_int_delayed, self.sinc_delay) # Filter built once by createsinc
 
             if not keep_edges:
                 self.pulse_shaped_delayed = self.pulse_shaped_delayed[(self.sinc_taps - 1) // 2 : -(self.sinc_taps - 1) // 2]
@@ -64,69 +141,73 @@ class PulseShaper:
 
         return self.pulse_shaped_delayed
 
-    def noise(self, is_complex: bool = False):
-        # Returns numpy.ndarray[numpy.float64] or numpy.ndarray[numpy.complex128] noisy pulses of shape (pulse_shaped_delayed,)
+    def noise(self, is_complex: bool = False, out: np.ndarray[np.float64] | np.ndarray[np.complex128] | None = None):
+        # Returns numpy.ndarray[dtype] or the matching complex numpy.ndarray noisy pulses of shape (pulse_shaped_delayed,)
         # is_complex: controls if AWGN is complex valued
-        pulse_power = np.mean(self.pulse_shaped_delayed**2)
-        variance = pulse_power / (10**(self.snr / 10)) # From SNR in dB, determine AWGN variance = AWGN power
-        
+        # out: buffer of shape (pulse_shaped_delayed,), dtype or its complex counterpart, written in place instead of allocating a new array
+        return next(self.noise_sweep([self.snr], is_complex=is_complex, out=out)) # A one SNR sweep, both paths share the power, std and noise steps
+
+    def noise_sweep(self, snr: np.ndarray[np.float64], is_complex: bool = False, out: np.ndarray[np.float64] | np.ndarray[np.complex128] | None = None):
+        # Yields numpy.ndarray[dtype] or the matching complex numpy.ndarray noisy pulses of shape (pulse_shaped_delayed,), one per SNR
+        # noise is a sweep over the single snr attribute, so each signal matches setting snr and calling noise
+        # Signal power is computed once and the AWGN standard deviations of all SNRs at once, noise is drawn one SNR at a time to bound memory
+        # snr: signal to noise ratios in dB, snr attribute is set to the SNR of the signal being yielded
+        # is_complex: controls if AWGN is complex valued
+        # out: buffer as in noise, every SNR overwrites it so each yielded signal is only valid until the next one is drawn
+        pulse_power = np.dot(self.pulse_shaped_delayed, self.pulse_shaped_delayed) / len(self.pulse_shaped_delayed) # Mean of squares without a squared temporary
+        snr = np.asarray(snr, dtype=np.float64)
+        std = np.sqrt(pulse_power / 10**(snr / 10) / (2 if is_complex else 1)) # Per SNR AWGN standard deviation, broadcast over snr
+        for cur_snr, cur_std in zip(snr, std):
+            self.snr = cur_snr
+            s = self._unit_noise(is_complex, out)
+            _scale_add(s, self.dtype.type(cur_std), self.pulse_shaped_delayed) # Noise buffer becomes the noisy signal, scaled and added in one pass. std in dtype keeps float32 arithmetic float32
+            self.pulse_shaped_delayed_noise = s
+            yield self.pulse_shaped_delayed_noise
+
+    def _unit_noise(self, is_complex: bool, out: np.ndarray[np.float64] | np.ndarray[np.complex128] | None = None):
+        # Returns numpy.ndarray[dtype] or the matching complex numpy.ndarray unit variance per component noise, of shape (pulse_shaped_delayed,)
+        # is_complex: controls if AWGN is complex valued
+        # out: buffer drawn into when provided, same draws as a new array
+        noise_dtype = np.result_type(self.dtype, np.complex64) if is_complex else self.dtype
+        if out is None:
+            out = np.empty(len(self.pulse_shaped_delayed), dtype=noise_dtype)
+        elif out.shape != self.pulse_shaped_delayed.shape or out.dtype != noise_dtype: # Buffer is reinterpreted as dtype and read alongside pulse_shaped_delayed without bounds checks
+            raise ValueError(f"out must have shape {self.pulse_shaped_delayed.shape} and dtype {noise_dtype}, got shape {out.shape} and dtype {out.dtype}")
         if is_complex:
-            s = np.sqrt(variance / 2) * (np.random.randn(len(self.pulse_shaped_delayed)) + 1j * np.random.randn(len(self.pulse_shaped_delayed)))  
+            self._rng.standard_normal(dtype=self.dtype, out=out.view(self.dtype).reshape(-1, 2)) # Interleaved real and imaginary draws, written through a real view of the complex buffer
         else:
-            s = np.random.normal(0, np.sqrt(variance), self.pulse_shaped_delayed.size)
-        
-        self.pulse_shaped_delayed_noise = self.pulse_shaped_delayed + s
-
-        return self.pulse_shaped_delayed_noise
+            self._rng.standard_normal(dtype=self.dtype, out=out)
+        return out
 
     def plot_rc(self, axs = None):
         # Visualize raised cosine
         # axs: matplotlib axis object. If included, plots on provided axis
-        if axs is not None:
-            axs.plot(self.raised_cosine, '.', label='RC')
-            axs.plot(self.zero_crossings, np.zeros(len(self.zero_crossings)), 'x', label='Zero Crossings')
-            axs.set_xlabel('Samples')
-            axs.set_ylabel('Amplitude')
-            axs.legend()
-            axs.set_title('Raised Cosine Filter')
-            axs.grid(True)
-        else:
-            plt.figure()
-            plt.plot(self.raised_cosine, '.', label='RC')
-            plt.plot(self.zero_crossings, np.zeros(len(self.zero_crossings)), 'x', label='Zero Crossings')
-            plt.xlabel('Samples')
-            plt.ylabel('Amplitude')
-            plt.legend()
-            plt.title('Raised Cosine Filter')
-            plt.grid(True)
+        axs = _axes(axs)
+        axs.plot(self.raised_cosine, '.', label='RC')
+        axs.plot(self.zero_crossings, np.zeros_like(self.zero_crossings), 'x', label='Zero Crossings')
+        axs.set_xlabel('Samples')
+        axs.set_ylabel('Amplitude')
+        axs.legend()
+        axs.set_title('Raised Cosine Filter')
+        axs.grid(True)
     
     def plot_pulse_shaped(self, start_idx: int | None = None, end_idx: int | None = None, axs = None):
         # Visualize shaped pulses
         # start_idx: Index of the pulse stream to plot first
         # end_idx: One higher than the index to be plotted last
         # axs: matplotlib axis object. If included, plots on provided axis
-        if start_idx is None:
-            start_idx = 0
-        if end_idx is None:
-            end_idx = len(self.pulse_shaped)
-
-        if axs is not None:
-            axs.plot(self.pulse_shaped[start_idx:end_idx], '.-', label='Pulse Shaped')
-            axs.set_xlabel('Samples')
-            axs.set_ylabel('Pulse Amplitude')
-            axs.legend()
-            axs.set_ylim((np.min(self.pulse_shaped[start_idx:end_idx]) - 0.2, np.max(self.pulse_shaped[start_idx:end_idx]) + 0.2))
-            axs.set_title('Symbols after Pulse Shaping with RC')
-            axs.grid(True)
-        else:
-            plt.figure()
-            plt.plot(self.pulse_shaped[start_idx:end_idx], '.-', label='Pulse Shaped')
-            plt.xlabel('Samples')
-            plt.ylabel('Pulse Amplitude')
-            plt.legend()
-            plt.ylim((np.min(self.pulse_shaped[start_idx:end_idx]) - 0.5, np.max(self.pulse_shaped[start_idx:end_idx]) + 0.5))
-            plt.title('Symbols after Pulse Shaping with RC')
-            plt.grid(True)
+        margin = 0.2 if axs is not None else 0.5
+        pulse_shaped = self.pulse_shaped[start_idx:end_idx] # None bounds slice from the start or to the end
+        low, high = pulse_shaped.min(), pulse_shaped.max()
+
+        axs = _axes(axs)
+        axs.plot(pulse_shaped, '.-', label='Pulse Shaped')
+        axs.set_xlabel('Samples')
+        axs.set_ylabel('Pulse Amplitude')
+        axs.legend()
+        axs.set_ylim((low - margin, high + margin))
+        axs.set_title('Symbols after Pulse Shaping with RC')
+        axs.grid(True)
 
     def plot_pulse_delayed(self, start_idx: int | None = None, end_idx: int | None = None, with_original: bool = False, axs = None):
         # Visualize shaped pulses
@@ -134,32 +215,19 @@ class PulseShaper:
         # end_idx: One higher than the index to be plotted last
         # with_original: controls if original pulse shaped is also plotted
         # axs: matplotlib axis object. If included, plots on provided axis
-        if start_idx is None:
-            start_idx = 0
-        if end_idx is None:
-            end_idx = len(self.pulse_shaped_delayed)
+        pulse_shaped_delayed = self.pulse_shaped_delayed[start_idx:end_idx]
+        low, high = pulse_shaped_delayed.min(), pulse_shaped_delayed.max()
 
-        if axs is not None:
-            axs.plot(self.pulse_shaped_delayed[start_idx:end_idx], '.-', label='Delayed Pulse')
-            if with_original:
-                axs.plot(self.pulse_shaped[start_idx:end_idx], '.-', label='Original Pulse')
-            axs.set_xlabel('Samples')
-            axs.set_ylabel('Pulse Amplitude')
-            axs.legend()
-            axs.set_ylim((np.min(self.pulse_shaped_delayed[start_idx:end_idx]) - 0.5, np.max(self.pulse_shaped_delayed[start_idx:end_idx]) + 0.5))
-            axs.set_title('Fractional Delayed Pulse Shaped Symbols')
-            axs.grid(True)
-        else:
-            plt.figure()
-            plt.plot(self.pulse_shaped_delayed[start_idx:end_idx], '.-', label='Delayed Pulse')
-            if with_original:
-                plt.plot(self.pulse_shaped[start_idx:end_idx], '.-', label='Original Pulse')
-            plt.xlabel('Samples')
-            plt.ylabel('Pulse Amplitude')
-            plt.legend()
-            plt.ylim((np.min(self.pulse_shaped_delayed[start_idx:end_idx]) - 0.5, np.max(self.pulse_shaped_delayed[start_idx:end_idx]) + 0.5))
-            plt.title('Fractional Delayed Pulse Shaped Symbols')
-            plt.grid(True)
+        axs = _axes(axs)
+        axs.plot(pulse_shaped_delayed, '.-', label='Delayed Pulse')
+        if with_original:
+            axs.plot(self.pulse_shaped[start_idx:end_idx], '.-', label='Original Pulse')
+        axs.set_xlabel('Samples')
+        axs.set_ylabel('Pulse Amplitude')
+        axs.legend()
+        axs.set_ylim((low - 0.5, high + 0.5))
+        axs.set_title('Fractional Delayed Pulse Shaped Symbols')
+        axs.grid(True)
     
     def plot_pulse_noisy(self, start_idx: int | None = None, end_idx: int | None = None, with_delayed: bool = False, is_complex: bool = False, axs = None):
         # Visualize noisy pulses
@@ -168,42 +236,22 @@ class PulseShaper:
         # with_delayed: controls if delayed pulse is also plotted
         # is_complex: controls if the noisy signal is plotted as real and imag values separately
         # axs: matplotlib axis object. If included, plots on provided axis
-        if start_idx is None:
-            start_idx = 0
-        if end_idx is None:
-            end_idx = len(self.pulse_shaped_delayed_noise)
-
-        if axs is not None:
-            if is_complex:
-                axs.plot(self.pulse_shaped_delayed_noise[start_idx:end_idx].real, '.-', label='Re{Noisy Delayed Pulse}')
-                axs.plot(self.pulse_shaped_delayed_noise[start_idx:end_idx].imag, '.-', label='Im{Noisy Delayed Pulse}')
-            else:
-                axs.plot(self.pulse_shaped_delayed_noise[start_idx:end_idx], '.-', label='Noisy Delayed Pulse')
-            
-            if with_delayed:
-                axs.plot(self.pulse_shaped_delayed[start_idx:end_idx], '.-', label='Delayed Pulse')
-
-            axs.set_xlabel('Samples')
-            axs.set_ylabel('Pulse Amplitude')
-            axs.legend()
-            axs.set_ylim((np.min(self.pulse_shaped_delayed_noise[start_idx:end_idx].real) - 0.5, np.max(self.pulse_shaped_delayed_noise[start_idx:end_idx].real) + 0.5))
-            axs.set_title('Noisy Delayed Pulse Shaped Symbols')
-            axs.grid(True)
+        noisy = self.pulse_shaped_delayed_noise[start_idx:end_idx]
+        low, high = noisy.real.min(), noisy.real.max()
+
+        axs = _axes(axs)
+        if is_complex:
+            axs.plot(noisy.real, '.-', label='Re{Noisy Delayed Pulse}')
+            axs.plot(noisy.imag, '.-', label='Im{Noisy Delayed Pulse}')
         else:
-            plt.figure()
-
-            if is_complex:
-                plt.plot(self.pulse_shaped_delayed_noise[start_idx:end_idx].real, '.-', label='Re{Noisy Delayed Pulse}')
-                plt.plot(self.pulse_shaped_delayed_noise[start_idx:end_idx].imag, '.-', label='Im{Noisy Delayed Pulse}')
-            else:
-                plt.plot(self.pulse_shaped_delayed_noise[start_idx:end_idx], '.-', label='Noisy Delayed Pulse')
-            
-            if with_delayed:
-                plt.plot(self.pulse_shaped_delayed[start_idx:end_idx], '.-', label='Delayed Pulse')
-
-            plt.xlabel('Samples')
-            plt.ylabel('Pulse Amplitude')
-            plt.legend()
-            plt.ylim((np.min(self.pulse_shaped_delayed_noise[start_idx:end_idx].real) - 0.5, np.max(self.pulse_shaped_delayed_noise[start_idx:end_idx].real) + 0.5))
-            plt.title('Noisy Delayed Pulse Shaped Symbols')
-            plt.grid(True)
\ No newline at end of file
+            axs.plot(noisy, '.-', label='Noisy Delayed Pulse')
+        
+        if with_delayed:
+            axs.plot(self.pulse_shaped_delayed[start_idx:end_idx], '.-', label='Delayed Pulse')
+
+        axs.set_xlabel('Samples')
+        axs.set_ylabel('Pulse Amplitude')
+        axs.legend()
+        axs.set_ylim((low - 0.5, high + 0.5))
+        axs.set_title('Noisy Delayed Pulse Shaped Symbols')
+        axs.grid(True)
@@ -1,24 +1,27 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from plotting import _axes
 
 class SymbolGenerator:
-    def __init__(self, num_symbols: int, sps: int):
+    def __init__(self, num_symbols: int, sps: int, rng: int | np.random.Generator | None = None):
         # num_symbols: number of symbols
         # sps: samples per symbol
+        # rng: seed or numpy Generator used to draw the symbols
         self.num_symbols = num_symbols
         self.sps = sps
+        self._rng = np.random.default_rng(rng)
         self.symbolstream()
-        self.pulsestream()
     
     def symbolstream(self):
-        # Returns numpy.ndarray[numpy.int64] of random BPSK symbol stream {-1,+1} of shape (num_symbols,)
+        # Returns numpy.ndarray[numpy.int8] of random BPSK symbol stream {-1,+1} of shape (num_symbols,)
         # Also defines attribute bit_stream, the binary version of symbol_stream
-        self.symbol_stream = np.random.choice([-1, 1], size=self.num_symbols)
-        self.bit_stream = (self.symbol_stream > 0).astype(int)
+        self.bit_stream = self._rng.integers(0, 2, size=self.num_symbols, dtype=np.int8) # Draw the bits directly, symbols follow as 2*bit - 1
+        self.symbol_stream = self.bit_stream * 2 - 1
+        self.pulse_stream = None # Built on demand by pulsestream, pulse shaping works directly from symbol_stream
         return self.symbol_stream
     
     def pulsestream(self):
         # Returns numpy.ndarray[numpy.float64] of symbol pulses with sps-1 zeros between them, of shape (num_symbols*sps,)
+        # Only needed for visualization, PulseShaper.pulseshaping skips the zeros and takes symbol_stream
         pulses = np.zeros(self.num_symbols * self.sps)
         pulses[::self.sps] = self.symbol_stream
         self.pulse_stream = pulses
@@ -29,32 +32,23 @@ class SymbolGenerator:
         # start_idx: Index of the pulse stream to plot first
         # end_idx: One higher than the index to be plotted last
         # axs: matplotlib axis object. If included, plots on provided axis
+        if self.pulse_stream is None:
+            self.pulsestream()
         if start_idx is None:
             start_idx = 0
         if end_idx is None:
             end_idx = len(self.pulse_stream)
         
-        if axs is not None:
-            axs.plot(self.pulse_stream[start_idx:end_idx], '.-', label='Pulses')
-            check = start_idx % self.sps
-            bit_indexes = np.arange(0-check, end_idx-start_idx, self.sps)
-            axs.plot(bit_indexes[bit_indexes>=0], self.bit_stream[-(-start_idx//self.sps):(end_idx-1)//self.sps + 1], 'x', label='Bits')
-            axs.set_ylim((-1.2,1.2))
-            axs.set_xlabel('Samples')
-            axs.set_ylabel('Symbol/Bit Value')
-            axs.legend()
-            axs.set_title('Symbols Pulse Train with Corresponding Bits')
-            axs.grid(True)
-        else:
-            plt.figure()
-            plt.plot(self.pulse_stream[start_idx:end_idx], '.-', label='Pulses')
-            check = start_idx % self.sps
-            bit_indexes = np.arange(0-check, end_idx-start_idx, self.sps)
-            plt.plot(bit_indexes[bit_indexes>=0], self.bit_stream[-(-start_idx//self.sps):(end_idx-1)//self.sps + 1], 'x', label='Bits')
-            plt.ylim((-1.2,1.2))
-            plt.xlabel('Samples')
-            plt.ylabel('Symbol/Bit Value')
-            plt.legend()
-            plt.title('Symbols Pulse Train with Corresponding Bits')
-            plt.grid(True)
+        check = start_idx % self.sps
+        bit_indexes = np.arange(0-check, end_idx-start_idx, self.sps)
+
+        axs = _axes(axs)
+        axs.plot(self.pulse_stream[start_idx:end_idx], '.-', label='Pulses')
+        axs.plot(bit_indexes[bit_indexes>=0], self.bit_stream[-(-start_idx//self.sps):(end_idx-1)//self.sps + 1], 'x', label='Bits')
+        axs.set_ylim((-1.2,1.2))
+        axs.set_xlabel('Samples')
+        axs.set_ylabel('Symbol/Bit Value')
+        axs.legend()
+        axs.set_title('Symbols Pulse Train with Corresponding Bits')
+        axs.grid(True)
 
@@ -1,28 +1,242 @@
+from enum import IntEnum
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.signal import resample_poly
+from scipy.signal import firwin
+from numba import njit, prange
+from plotting import _axes
+
+class TEDMethod(IntEnum):
+    # Timing error detector selection. Member names match the error_eq strings, upper cased, so either form can be passed
+    MUELLER = 0
+    GARDNER = 1
+    EARLYLATEGATE = 2
+
+def _ted_method(error_eq: str | TEDMethod):
+    # Returns TEDMethod for a method name such as 'mueller', or for a TEDMethod/int, resolved once at the Python boundary
+    if isinstance(error_eq, str):
+        return TEDMethod[error_eq.upper()]
+    return TEDMethod(error_eq)
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _polyphase_upsample(signal: np.ndarray[np.float64] | np.ndarray[np.complex128], poly: np.ndarray[np.float64], out: np.ndarray[np.float64] | np.ndarray[np.complex128]):
+    # Fills out, of shape (len(signal)*upsample,), with signal upsampled through a polyphase filter bank
+    # signal: array to be upsampled
+    # poly: polyphase filter bank of shape (upsample, taps), where output sample n*upsample + p is the dot product of poly[p] with signal[n + taps//2 - q]
+    upsample, taps = poly.shape
+    half = taps // 2
+    n_in = len(signal)
+    for n in prange(n_in):
+        q_lo = max(0, n + half - n_in + 1) # Taps reaching past either edge of the signal multiply zeros, skip them
+        q_hi = min(taps, n + half + 1)
+        for p in range(upsample):
+            acc = out.dtype.type(0) # Accumulate in the output precision so float32 stays float32
+            for q in range(q_lo, q_hi):
+                acc += poly[p, q] * signal[n + half - q]
+            out[n * upsample + p] = acc
+
+@njit(fastmath=True, cache=True)
+def _sample(signal: np.ndarray[np.float64] | np.ndarray[np.complex128], poly: np.ndarray[np.float64], idx: int):
+    # Returns scalar of the signal's dtype, value at index idx of signal upsampled through poly, without upsampling the whole signal
+    # Same value _polyphase_upsample writes to out[idx]
+    # signal: array to sample from, prior to interpolation
+    # poly: polyphase filter bank of shape (upsample, taps)
+    upsample, taps = poly.shape
+    half = taps // 2
+    n = idx // upsample
+    p = idx - n * upsample
+    q_lo = max(0, n + half - len(signal) + 1)
+    q_hi = min(taps, n + half + 1)
+    acc = signal.dtype.type(0) # Accumulate in the signal precision so float32 stays float32
+    for q in range(q_lo, q_hi):
+        acc += poly[p, q] * signal[n + half - q]
+    return acc
+
+@njit(fastmath=True, cache=True)
+def _loop_filter(tau: float, v: float, error: float, gain: float, Kp: float, Ki: float, use_pi: bool, sps: int):
+    # Returns (tau, v), the offset updated by the PLL and the accumulated integral term
+    # v: accumulated integral error, only used when use_pi is True
+    if use_pi:
+        v += Ki * error
+        tau += v + Kp * error
+    else:
+        tau += gain * error
+    tau %= sps # Constrains tau to be between 0 and sps
+    return tau, v
+
+@njit(fastmath=True, cache=True)
+def _decide(val: np.float64 | np.complex128):
+    # Returns float BPSK decision {-1.0,+1.0} from the sign of the real part, never a symbol of 0
+    # A single compare that compiles to a branchless select, no np.sign ufunc dispatch or angle computation
+    return 1.0 if val.real >= 0.0 else -1.0
+
+@njit(fastmath=True, cache=True)
+def _mueller_muller(val_cur: np.float64 | np.complex128, val_prev: np.float64 | np.complex128, symbol_prev: float):
+    # Returns (error, symbol_cur), numpy.float64 error using Mueller and Muller method and the decided current symbol it used
+    # The decision doubles as the next symbol_prev, so callers do not decide the symbol a second time
+    symbol_cur = _decide(val_cur)
+    error = (val_cur * symbol_prev - symbol_cur * np.conj(val_prev)).real
+    return error, symbol_cur
+
+@njit(fastmath=True, cache=True)
+def _earlylategate(val_early: np.float64 | np.complex128, val_late: np.float64 | np.complex128):
+    # Returns numpy.float64 error using Early-Late Gate method, |val_early|^2 - |val_late|^2
+    # Expanded into real and imaginary parts so no sqrt is taken, for both real and complex values
+    return (val_early.real*val_early.real + val_early.imag*val_early.imag) - (val_late.real*val_late.real + val_late.imag*val_late.imag)
+
+@njit(fastmath=True, cache=True)
+def _run_mueller(signal: np.ndarray[np.float64] | np.ndarray[np.complex128], poly: np.ndarray[np.float64], upsample: int, sps: int, shift: int, tau: float, gain: float, Kp: float, Ki: float, use_pi: bool, symbol_prev: float, error: np.ndarray[np.float64], offset: np.ndarray[np.float64], symbols_pred: np.ndarray[np.int8], out_signal: np.ndarray[np.float64] | np.ndarray[np.complex128]):
+    # Compiled Mueller and Muller loop, fills error, offset, symbols_pred[1:] and out_signal[1:] in place
+    # Runs len(symbols_pred) - 1 symbol periods. error, offset and out_signal may have length 1, then only their latest value is kept
+    # signal: real or complex signal the TED samples from, not upsampled
+    # poly: TED interpolation bank from createpolyphase, applied on demand to the signal prior to interpolation
+    # upsample: upscaling factor of interpolation
+    # shift: unused, keeps the signature shared with the other TED loops
+    sps_up = sps * upsample
+    i_up = 0 # Start of the current symbol period in index units of the interpolated signal
+    v = 0.0
+    for k in range(len(symbols_pred) - 1):
+        j = k % len(error) # History index, always 0 when only the latest error and offset are kept
+        i_up += sps_up
+        offset_cur = i_up + int(tau * upsample) # Round offset tau to nearest integer index
+        val_cur = _sample(signal, poly, offset_cur)
+        val_prev = _sample(signal, poly, offset_cur - sps_up)
+        error[j], symbol_prev = _mueller_muller(val_cur, val_prev, symbol_prev) # Decision made once, reused as the next symbol_prev
+        symbols_pred[k + 1] = symbol_prev
+        tau, v = _loop_filter(tau, v, error[j], gain, Kp, Ki, use_pi, sps)
+        offset[j] = tau
+        out_signal[(k + 1) % len(out_signal)] = val_cur
+    return tau
+
+@njit(fastmath=True, cache=True)
+def _run_gardner(signal: np.ndarray[np.float64] | np.ndarray[np.complex128], poly: np.ndarray[np.float64], upsample: int, sps: int, shift: int, tau: float, gain: float, Kp: float, Ki: float, use_pi: bool, symbol_prev: float, error: np.ndarray[np.float64], offset: np.ndarray[np.float64], symbols_pred: np.ndarray[np.int8], out_signal: np.ndarray[np.float64] | np.ndarray[np.complex128]):
+    # Compiled Gardner loop, fills error, offset, symbols_pred[1:] and out_signal[1:] in place, history as in _run_mueller
+    # signal: real or complex signal the TED samples from, not upsampled
+    # poly: TED interpolation bank from createpolyphase, applied on demand to the signal prior to interpolation
+    # upsample: upscaling factor of interpolation
+    # shift: unused, keeps the signature shared with the other TED loops
+    sps_up = sps * upsample
+    half_up = sps_up // 2
+    i_up = 0
+    v = 0.0
+    for k in range(len(symbols_pred) - 1):
+        j = k % len(error) # History index, always 0 when only the latest error and offset are kept
+        i_up += sps_up
+        offset_cur = i_up + int(tau * upsample)
+        val_cur = _sample(signal, poly, offset_cur)
+        val_prev = _sample(signal, poly, offset_cur - sps_up)
+        val_middle = _sample(signal, poly, offset_cur - half_up)
+        error[j] = -(np.conj(val_middle) * (val_cur - val_prev)).real # Note: Using negative error here to keep consistent with tau += instead of tau -=
+        symbols_pred[k + 1] = _decide(val_cur)
+        tau, v = _loop_filter(tau, v, error[j], gain, Kp, Ki, use_pi, sps)
+        offset[j] = tau
+        out_signal[(k + 1) % len(out_signal)] = val_cur
+    return tau
+
+@njit(fastmath=True, cache=True)
+def _run_earlylategate(signal: np.ndarray[np.float64] | np.ndarray[np.complex128], poly: np.ndarray[np.float64], upsample: int, sps: int, shift: int, tau: float, gain: float, Kp: float, Ki: float, use_pi: bool, symbol_prev: float, error: np.ndarray[np.float64], offset: np.ndarray[np.float64], symbols_pred: np.ndarray[np.int8], out_signal: np.ndarray[np.float64] | np.ndarray[np.complex128]):
+    # Compiled Early-Late Gate loop, fills error, offset, symbols_pred[1:] and out_signal[1:] in place, history as in _run_mueller
+    # signal: real or complex signal the TED samples from, not upsampled
+    # poly: TED interpolation bank from createpolyphase, applied on demand to the signal prior to interpolation
+    # upsample: upscaling factor of interpolation
+    # shift: early/late shift in interpolated samples
+    # symbol_prev: unused, keeps the signature shared with the other TED loops
+    sps_up = sps * upsample
+    i_up = 0
+    v = 0.0
+    for k in range(len(symbols_pred) - 1):
+        j = k % len(error) # History index, always 0 when only the latest error and offset are kept
+        i_up += sps_up
+        offset_cur = i_up + int(tau * upsample)
+        val_cur = _sample(signal, poly, offset_cur)
+        if offset_cur + shift >= len(signal) * poly.shape[0]:
+            error[j] = error[(k - 1) % len(error)] if k > 0 else 0.0 # Not enough samples, repeat last error value to avoid distorting result
+        else:
+            val_early = _sample(signal, poly, offset_cur - shift)
+            val_late = _sample(signal, poly, offset_cur + shift)
+            error[j] = -_earlylategate(val_early, val_late) # Note: Using negative error here to keep consistent with tau += instead of tau -=
+        symbols_pred[k + 1] = _decide(val_cur)
+        tau, v = _loop_filter(tau, v, error[j], gain, Kp, Ki, use_pi, sps)
+        offset[j] = tau
+        out_signal[(k + 1) % len(out_signal)] = val_cur
+    return tau
+
+_TED_LOOPS = {TEDMethod.MUELLER: _run_mueller, TEDMethod.GARDNER: _run_gardner, TEDMethod.EARLYLATEGATE: _run_earlylategate}
+_TED_NAMES = {TEDMethod.MUELLER: 'Mueller and Muller', TEDMethod.GARDNER: 'Gardner', TEDMethod.EARLYLATEGATE: 'Early-Late Gate'}
 
 class TimingErrorDetector:
-    def __init__(self, upsample: int):
+    def __init__(self, upsample: int, dtype: type = np.float64):
         # upsample: upscaling factor of interpolation
+        # dtype: float type of the interpolation filter and interpolated signal, np.float32 halves memory traffic (complex signals become complex64)
         self.upsample = upsample
+        self.dtype = np.dtype(dtype)
+        self.createpolyphase()
+
+    def createpolyphase(self):
+        # Returns numpy.ndarray[dtype] polyphase interpolation filter bank, of shape (upsample, 21), or (1, 1) when upsample is 1
+        # Same Kaiser windowed lowpass that scipy.signal.resample_poly designs, built once instead of on every interpolation
+        if self.upsample == 1: # No interpolation, like resample_poly with up=1. firwin cannot design a lowpass at the Nyquist frequency
+            self._poly = np.ones((1, 1), dtype=self.dtype)
+            return self._poly
+        half_len = 10 * self.upsample
+        h = firwin(2 * half_len + 1, 1 / self.upsample, window=('kaiser', 5.0)) * self.upsample
+        h = np.concatenate((h, np.zeros(self.upsample - 1))) # Pad to a whole number of taps per phase
+        self._poly = np.ascontiguousarray(h.reshape(-1, self.upsample).T, dtype=self.dtype) # Row p holds taps p, p + upsample, p + 2*upsample, ...
+        return self._poly
+
+    def set_signal(self, signal: np.ndarray[np.float64] | np.ndarray[np.complex128]):
+        # Sets the signal main runs on, without upsampling it
+        # Interpolation is applied on demand: main, sample_at and interpolate_window only compute the upsampled values they read
+        # The full upsampled signal, attribute interpolated_pulse, is only built when it is first read
+        # signal: array to be upsampled
+        self.signal = np.ascontiguousarray(signal, dtype=np.result_type(self.dtype, np.complex64) if np.iscomplexobj(signal) else self.dtype) # Strided views would compile to a slower any-layout kernel
+        self._interpolated_pulse = None
 
     def interpolator(self, signal: np.ndarray[np.float64] | np.ndarray[np.complex128]):
-        # Returns numpy.ndarray[numpy.float64] or numpy.ndarray[numpy.complex128] upsampled signal of shape (len(signal)*upsample,)
+        # Returns numpy.ndarray[dtype] or the matching complex numpy.ndarray upsampled signal of shape (len(signal)*upsample,)
+        # Sets the signal as set_signal does and upsamples all of it. Use set_signal when only main or a window of the upsampled signal is needed
         # signal: array to be upsampled
-        upsample = 32
-        self.interpolated_pulse = resample_poly(signal, upsample, 1) # upsample * sps = new number of samples per symbol
+        self.set_signal(signal)
         return self.interpolated_pulse
 
+    @property
+    def interpolated_pulse(self):
+        # Returns numpy.ndarray[dtype] or the matching complex numpy.ndarray upsampled signal of shape (len(signal)*upsample,)
+        # Built on first read and kept until set_signal or interpolator is given a new signal
+        if self._interpolated_pulse is None:
+            self._interpolated_pulse = np.empty(len(self.signal) * self.upsample, dtype=np.result_type(self.signal, self._poly)) # upsample * sps = new number of samples per symbol
+            _polyphase_upsample(self.signal, self._poly, self._interpolated_pulse)
+        return self._interpolated_pulse
+
+    def interpolate_window(self, start_idx: int | None = None, end_idx: int | None = None):
+        # Returns numpy.ndarray[dtype] or the matching complex numpy.ndarray interpolated_pulse[start_idx:end_idx]
+        # Only upsamples the input samples the window depends on, unless the full upsampled signal was already built
+        # start_idx: index of the upsampled signal to return first
+        # end_idx: one higher than the index to be returned last
+        if self._interpolated_pulse is not None:
+            return self._interpolated_pulse[start_idx:end_idx]
+        start, end, _ = slice(start_idx, end_idx).indices(len(self.signal) * self.upsample)
+        end = max(start, end)
+        half = self._poly.shape[1] // 2 # Input samples each side of an output that its taps reach
+        n_lo = max(start // self.upsample - half, 0)
+        n_hi = min(-(-end // self.upsample) + half, len(self.signal))
+        window = np.empty((n_hi - n_lo) * self.upsample, dtype=np.result_type(self.signal, self._poly))
+        _polyphase_upsample(self.signal[n_lo:n_hi], self._poly, window)
+        return window[start - n_lo * self.upsample : end - n_lo * self.upsample]
+
+    def sample_at(self, integer_idx: int, phase_idx: int = 0):
+        # Returns scalar of dtype or its complex counterpart, the upsampled value integer_idx + phase_idx/upsample samples into the signal
+        # Same value as interpolated_pulse[integer_idx*upsample + phase_idx], computed from a single row of the polyphase bank
+        # integer_idx: sample index of the signal prior to interpolation
+        # phase_idx: fractional position between integer_idx and integer_idx + 1, in units of 1/upsample samples [0, upsample)
+        return np.result_type(self.signal, self._poly).type(_sample(self.signal, self._poly, integer_idx * self.upsample + phase_idx)) # Numba returns Python scalars, restore the precision
+
     @staticmethod
     def mueller_muller(val_cur: np.float64 | np.complex128, val_prev: np.float64 | np.complex128, symbol_prev: np.float64):
-        # Returns numpy.float64 error using Mueller and Muller method
+        # Returns (error, symbol_cur), numpy.float64 error using Mueller and Muller method and the decided current symbol {-1,+1}
         # val_cur: interpolated value at current offset
         # val_prev: interpolated value one symbol period before current offset
         # symbol_prev: decided symbol value one symbol period before current offset
-        symbol_cur = np.sign(np.real(val_cur))
-        error = np.real((val_cur * np.conj(symbol_prev)) - (symbol_cur * np.conj(val_prev)))
-        return error
+        error, symbol_cur = _mueller_muller(val_cur, val_prev, symbol_prev) # Compiled helper shared with the TED loop
+        return error, symbol_cur
     
     @staticmethod
     def gardner(val_cur: np.float64 | np.complex128, val_prev: np.float64 | np.complex128, val_middle: np.float64 | np.complex128):
@@ -38,14 +252,14 @@ class TimingErrorDetector:
         # Returns numpy.float64 error using Early-Late Gate method
         # val_early: interpolated value at current offset minus a small shift
         # val_late: interpolated value at current offset plus a small shift
-        error = np.abs(val_early)**2 - np.abs(val_late)
+        error = _earlylategate(val_early, val_late) # Compiled helper shared with the TED loop
         return error
 
-    def main(self, num_samples: int, sps: int, error_eq: str, tau: float = 0.0, gain: float = 0.1, Kp: float = 0.01, Ki: float = 0.0001, delta: int = 4, symbol_prev: int | np.float64 = 0, use_pi: bool = False):
+    def main(self, num_samples: int, sps: int, error_eq: str | TEDMethod, tau: float = 0.0, gain: float = 0.1, Kp: float = 0.01, Ki: float = 0.0001, delta: int = 4, symbol_prev: int | np.float64 = 0, use_pi: bool = False, keep_history: bool = True):
         # Main timing error detector loop
         # num_samples: length of the signal prior to interpolation
         # sps: samples per symbol
-        # error_eq: selection of the error equation. Choose from ['mueller', 'gardner', 'earlylategate]
+        # error_eq: selection of the error equation. Choose from ['mueller', 'gardner', 'earlylategate] or the matching TEDMethod
         # tau: offset (in samples)
         # gain: loop filter gain
         # Kp: proportional gain
@@ -53,49 +267,24 @@ class TimingErrorDetector:
         # delta: inverse multiplicative factor for early late gate shift. Used as sps / delta = shift
         # symbol_prev: first decided symbol, used as initial condition
         # use_pi: controls if the error is updated using the proportional integral method. Default is loop fitler gain, not PI
-        i_cur = sps
-        error = [] # Track error
-        offset = [] # Track offset
-        symbols_pred = [symbol_prev] # Track predicted symbols, first guess is technically symbol_prev, but that's just used as an initial condition
-        out_signal = [self.interpolated_pulse[0]] # Store interpolated signal values as sampling aligns. First value will be first inerpolated signal value
-        
-        if use_pi:
-            v = 0.0
-
-        while i_cur < num_samples:
-            offset_cur = i_cur*self.upsample + int(tau*self.upsample) # Multiply by upsample to put in index units of the interpolated signal. Round offset tau to nearest integer index
-            val_cur = self.interpolated_pulse[offset_cur] # Raw value
-            val_prev = self.interpolated_pulse[offset_cur - sps*self.upsample] # Raw value one symbol period before the current one
-
-            if error_eq == 'mueller':
-                error.append(self.mueller_muller(val_cur, val_prev, symbol_prev))
-            elif error_eq == 'gardner':
-                val_middle = self.interpolated_pulse[offset_cur - int(sps*self.upsample/2)]
-                error.append(-self.gardner(val_cur, val_prev, val_middle)) # Note: Using negative error here to keep consistent with tau += instead of tau -=
-            elif error_eq == 'earlylategate':
-                shift = int((sps / delta) * self.upsample)
-                if offset_cur + shift > len(self.interpolated_pulse):
-                    error.append(error[-1]) # Not enough samples, repeat last error value to avoid distorting result
-                else:
-                    val_early = self.interpolated_pulse[offset_cur - shift]
-                    val_late = self.interpolated_pulse[offset_cur + shift]
-                    error.append(-self.earlylategate(val_early, val_late)) # Note: Using negative error here to keep consistent with tau += instead of tau -=
-
-
-            symbol_prev = np.sign(np.real(val_cur)) # Makes symbol decision, converts raw values to +1 or -1
-            symbols_pred.append(symbol_prev)
-
-            if use_pi:
-                v += (Ki * error[-1])
-                tau += v + Kp * error[-1]
-            else:
-                tau += gain*error[-1]
-
-            tau %= sps # Constrains tau to be between 0 and sps
-            offset.append(tau)
-            i_cur += sps # Move forward one sample period for next iteration
-            out_signal.append(val_cur)
-
+        # keep_history: if false, error, offset and out_signal only hold their final value, enough for results. Plotting requires True
+        run_loop = _TED_LOOPS[_ted_method(error_eq)] # Dispatch once to the compiled loop of the chosen TED
+        n_iter = (num_samples - 1) // sps # Number of symbol periods stepped through, starting one symbol period in
+        if (n_iter + 1) * sps > len(self.signal):
+            raise Exception("Signal is too short for the given num_samples and sps")
+
+        n_history = n_iter if keep_history else 1 # Sweeps only need the decisions and the final offset
+        error = np.empty(n_history) # Track error
+        offset = np.empty(n_history) # Track offset
+        symbols_pred = np.empty(n_iter + 1, dtype=np.int8) # Track predicted symbols, first guess is technically symbol_prev, but that's just used as an initial condition
+        symbols_pred[0] = symbol_prev
+        out_signal = np.empty(n_history + 1 if keep_history else 1, dtype=np.result_type(self.signal, self._poly)) # Store interpolated signal values as sampling aligns. First value will be first inerpolated signal value
+        out_signal[0] = _sample(self.signal, self._poly, 0)
+
+        shift = (sps * self.upsample) // delta # Early late gate shift in interpolated samples
+        run_loop(self.signal, self._poly, self.upsample, sps, shift, float(tau), gain, Kp, Ki, use_pi, float(symbol_prev), error, offset, symbols_pred, out_signal)
+
+        self.keep_history = keep_history # Plots need the full history
         self.offset = offset
         self.error = error
         self.symbols_pred = symbols_pred
@@ -103,26 +292,37 @@ class TimingErrorDetector:
 
         return offset, error, symbols_pred, out_signal
 
-    def results(self, symbols: np.ndarray[np.int64], keep_all: bool = True, print_results: bool = False):
+    def warmup(self, sps: int, is_complex: bool = False):
+        # Compiles, or loads from the on-disk cache, the interpolation kernel and every TED loop for this dtype on a tiny signal
+        # Call before timing a sweep so the first iteration does not include JIT compilation. Leaves all attributes untouched
+        # sps: samples per symbol
+        # is_complex: controls if the kernels are compiled for complex signals
+        signal = np.zeros(4 * sps, dtype=np.result_type(self.dtype, np.complex64) if is_complex else self.dtype)
+        out_dtype = np.result_type(signal, self._poly)
+        _polyphase_upsample(signal, self._poly, np.empty(len(signal) * self.upsample, dtype=out_dtype))
+        n_iter = (len(signal) - 1) // sps
+        for run_loop in _TED_LOOPS.values():
+            run_loop(signal, self._poly, self.upsample, sps, sps * self.upsample // 4, 0.0, 0.1, 0.01, 0.0001, False, 0.0, np.empty(n_iter), np.empty(n_iter), np.empty(n_iter + 1, dtype=np.int8), np.empty(n_iter + 1, dtype=out_dtype))
+
+    def results(self, symbols: np.ndarray[np.int8], keep_all: bool = True, print_results: bool = False):
         # Return and/or print statistics of previously ran TED algorithm
+        # Symbols past the last decision, when main ran over fewer samples than the symbols span, are left out
         # symbols: original sequence of symbols
         # keep_all: if false, skip the first 30 predicted symbols, considered as a preamble for bit syncing
         # print_results: if true, format print the statistics
-        if keep_all:
-            num_correct = np.sum(np.array(self.symbols_pred) == symbols)
-            num_symbols = len(symbols)
-        else:
-            num_correct = np.sum(np.array(self.symbols_pred[30:]) == symbols[30:])
-            num_symbols = len(symbols[30:])
+        start = 0 if keep_all else 30
+        end = min(len(symbols), len(self.symbols_pred)) # Aligned views, no copies
+        num_correct = np.count_nonzero(self.symbols_pred[start:end] == symbols[start:end]) # Both int8, compared without conversion. BPSK, so symbol errors are bit errors
+        num_symbols = end - start
 
         perc_correct = (num_correct / num_symbols)*100
         ber = (num_symbols - num_correct) / num_symbols * 100
         final_offset = self.offset[-1]
 
         if print_results:
-            print(f"Correct Symbol Predictions: {num_correct}/{num_symbols} -> {num_correct/num_symbols*100:.2f}%")
-            print(f"BER: {(num_symbols - num_correct)/num_symbols*100:.8f}%")
-            print(f"Final Offset in Samples: {self.offset[-1]:.1f}")
+            print(f"Correct Symbol Predictions: {num_correct}/{num_symbols} -> {perc_correct:.2f}%")
+            print(f"BER: {ber:.8f}%")
+            print(f"Final Offset in Samples: {final_offset:.1f}")
         
         return perc_correct, ber, final_offset
 
@@ -136,134 +336,77 @@ class TimingErrorDetector:
         if start_idx is None:
             start_idx = 0
         if end_idx is None:
-            end_idx = len(self.interpolated_pulse)
+            end_idx = len(self.signal) * self.upsample
 
+        interpolated = self.interpolate_window(start_idx, end_idx) # Upsamples the plotted window only, not the whole signal
         if original is not None:
-                check = start_idx % self.upsample
-                original_indexes = np.arange(0-check, end_idx-start_idx, self.upsample)
-
-        if axs is not None:
-            if is_complex:
-                axs.plot(self.interpolated_pulse[start_idx:end_idx].real, '.', label='Re{Interpolated Pulses}')
-                axs.plot(self.interpolated_pulse[start_idx:end_idx].imag, '.', label='Im{Interpolated Pulses}')
+            check = start_idx % self.upsample
+            original_indexes = np.arange(0-check, end_idx-start_idx, self.upsample)
+            original_indexes = original_indexes[original_indexes>=0]
+            original = original[-(-start_idx//self.upsample):(end_idx-1)//self.upsample + 1]
 
-                if original is not None:
-                    axs.plot(original_indexes[original_indexes>=0], original[-(-start_idx//self.upsample):(end_idx-1)//self.upsample + 1].real, '.', label='Re{Original Pulses}')
-                    axs.plot(original_indexes[original_indexes>=0], original[-(-start_idx//self.upsample):(end_idx-1)//self.upsample + 1].imag, '.', label='Im{Original Pulses}')
+        axs = _axes(axs)
+        if is_complex:
+            axs.plot(interpolated.real, '.', label='Re{Interpolated Pulses}')
+            axs.plot(interpolated.imag, '.', label='Im{Interpolated Pulses}')
 
-            else:
-                axs.plot(self.interpolated_pulse[start_idx:end_idx], '.', label='Interpolated Pulses')
+            if original is not None:
+                axs.plot(original_indexes, original.real, '.', label='Re{Original Pulses}')
+                axs.plot(original_indexes, original.imag, '.', label='Im{Original Pulses}')
 
-                if original is not None:
-                    axs.plot(original_indexes[original_indexes>=0], original[-(-start_idx//self.upsample):(end_idx-1)//self.upsample + 1], '.', label='Original Pulses')
-
-            axs.set_xlabel('Samples')
-            axs.set_ylabel('Pulse Amplitude')
-            axs.legend()
-            axs.set_title('Upsampled Pulse Shaped Symbols')
-            axs.grid(True)
         else:
-            plt.figure()
-
-            if is_complex:
-                plt.plot(self.interpolated_pulse[start_idx:end_idx].real, '.', label='Re{Interpolated Pulses}')
-                plt.plot(self.interpolated_pulse[start_idx:end_idx].imag, '.', label='Im{Interpolated Pulses}')
-
-                if original is not None:
-                    plt.plot(original_indexes[original_indexes>=0], original[-(-start_idx//self.upsample):(end_idx-1)//self.upsample + 1].real, '.', label='Re{Original Pulses}')
-                    plt.plot(original_indexes[original_indexes>=0], original[-(-start_idx//self.upsample):(end_idx-1)//self.upsample + 1].imag, '.', label='Im{Original Pulses}')
+            axs.plot(interpolated, '.', label='Interpolated Pulses')
 
-            else:
-                plt.plot(self.interpolated_pulse[start_idx:end_idx], '.', label='Interpolated Pulses')
+            if original is not None:
+                axs.plot(original_indexes, original, '.', label='Original Pulses')
 
-                if original is not None:
-                    plt.plot(original_indexes[original_indexes>=0], original[-(-start_idx//self.upsample):(end_idx-1)//self.upsample + 1], '.', label='Original Pulses')
-
-        plt.xlabel('Samples')
-        plt.ylabel('Pulse Amplitude')
-        plt.legend()
-        plt.title('Upsampled Pulse Shaped Symbols')
-        plt.grid(True)
+        axs.set_xlabel('Samples')
+        axs.set_ylabel('Pulse Amplitude')
+        axs.legend()
+        axs.set_title('Upsampled Pulse Shaped Symbols')
+        axs.grid(True)
     
-    def plot_final_constellation(self, error_eq: str, keep_all: bool = True, axs = None):
+    def plot_final_constellation(self, error_eq: str | TEDMethod, keep_all: bool = True, axs = None):
         # Visualize I/Q constellation across TED iterations
-        # error_eq: selection of the error equation. Choose from ['mueller', 'gardner', 'earlylategate]
+        # error_eq: selection of the error equation. Choose from ['mueller', 'gardner', 'earlylategate] or the matching TEDMethod
         # keep_all: if false, skip the first 30 predicted symbols, considered as a preamble for bit syncing
         # axs: matplotlib axis object. If included, plots on provided axis
-        if error_eq == 'mueller':
-            title = 'I/Q Constellation using Mueller and Muller'
-        elif error_eq == 'gardner':
-            title = 'I/Q Constellation using Gardner'
-        elif error_eq == 'earlylategate':
-            title = 'I/Q Constellation using Early-Late Gate'
+        title = f'I/Q Constellation using {_TED_NAMES[_ted_method(error_eq)]}'
+
+        if not self.keep_history:
+            raise Exception("History was not kept, run main with keep_history=True to plot the constellation")
+        if not keep_all and len(self.out_signal) < 100:
+            raise Exception("Number of symbols must be at least 100 in order to set keep_all to False")
+        in_phase, quadrature = np.real(self.out_signal), np.imag(self.out_signal)
+        start = 0 if keep_all else 30
         
-        if axs is not None:
-            if keep_all:
-                axs.plot(np.real(self.out_signal), np.imag(self.out_signal), '.', label='IQ Samples')
-            else:
-                if len(self.out_signal) < 100:
-                    raise Exception("Number of symbols must be at least 100 in order to set keep_all to False")
-                axs.plot(np.real(self.out_signal[30:]), np.imag(self.out_signal[30:]), '.', label='IQ Samples')
-
-            axs.set_xlabel('I')
-            axs.set_ylabel('Q')
-            axs.legend()
-            axs.set_xlim((np.real(self.out_signal).min() - 0.2, np.real(self.out_signal).max() + 0.2))
-            axs.set_ylim((np.imag(self.out_signal).min() - 0.2, np.imag(self.out_signal).max() + 0.2))
-            axs.set_title(title)
-            axs.grid(True)
-        else:
-            plt.figure()
-
-            if keep_all:
-                plt.plot(np.real(self.out_signal), np.imag(self.out_signal), '.', label='IQ Samples')
-            else:
-                if len(self.out_signal) < 100:
-                    raise Exception("Number of symbols must be at least 100 in order to set keep_all to False")
-                plt.plot(np.real(self.out_signal[30:]), np.imag(self.out_signal[30:]), '.', label='IQ Samples')
-
-            plt.xlabel('I')
-            plt.ylabel('Q')
-            plt.legend()
-            plt.xlim((np.real(self.out_signal).min() - 0.2, np.real(self.out_signal).max() + 0.2))
-            plt.ylim((np.imag(self.out_signal).min() - 0.2, np.imag(self.out_signal).max() + 0.2))
-            plt.title(title)
-            plt.grid(True)
-
-    def plot_offset(self, error_eq: str, sps: int, start_idx: int | None = None, end_idx: int | None = None, axs = None):
+        axs = _axes(axs)
+        axs.plot(in_phase[start:], quadrature[start:], '.', label='IQ Samples')
+        axs.set_xlabel('I')
+        axs.set_ylabel('Q')
+        axs.legend()
+        axs.set_xlim((in_phase.min() - 0.2, in_phase.max() + 0.2))
+        axs.set_ylim((quadrature.min() - 0.2, quadrature.max() + 0.2))
+        axs.set_title(title)
+        axs.grid(True)
+
+    def plot_offset(self, error_eq: str | TEDMethod, sps: int, start_idx: int | None = None, end_idx: int | None = None, axs = None):
         # Visualize offset value per iteration
-        # error_eq: selection of the error equation. Choose from ['mueller', 'gardner', 'earlylategate]
+        # error_eq: selection of the error equation. Choose from ['mueller', 'gardner', 'earlylategate] or the matching TEDMethod
         # sps: samples per symbol, sets the y-limit
         # start_idx: index of the pulse stream to plot first
         # end_idx: one higher than the index to be plotted last
         # axs: matplotlib axis object. If included, plots on provided axis
-        if start_idx is None:
-            start_idx = 0
-        if end_idx is None:
-            end_idx = len(self.offset)
-
-        if error_eq == 'mueller':
-            title = 'Offset Convergence using Mueller and Muller'
-        elif error_eq == 'gardner':
-            title = 'Offset Convergence using Gardner'
-        elif error_eq == 'earlylategate':
-            title = 'Offset Convergence using Early-Late Gate'
-
-        if axs is not None:
-            axs.plot(self.offset[start_idx:end_idx], '.', label='Offset')
-            axs.set_xlabel('Iteration')
-            axs.set_ylabel('Offset (Fractional Samples)')
-            axs.set_ylim((0,sps))
-            axs.legend()
-            axs.set_title(title)
-            axs.grid(True)
-        else:
-            plt.figure()
-            plt.plot(self.offset[start_idx:end_idx], '.', label='Offset')
-            plt.xlabel('Iteration')
-            plt.ylabel('Offset (Fractional Samples)')
-            plt.ylim((0,sps))
-            plt.legend()
-            plt.title(title)
-            plt.grid(True)
+        title = f'Offset Convergence using {_TED_NAMES[_ted_method(error_eq)]}'
+        if not self.keep_history:
+            raise Exception("History was not kept, run main with keep_history=True to plot the offset")
+
+        axs = _axes(axs)
+        axs.plot(self.offset[start_idx:end_idx], '.', label='Offset')
+        axs.set_xlabel('Iteration')
+        axs.set_ylabel('Offset (Fractional Samples)')
+        axs.set_ylim((0,sps))
+        axs.legend()
+        axs.set_title(title)
+        axs.grid(True)
 
@@ -0,0 +1,7 @@
+def _axes(axs):
+    # Returns axs, or the axis of a new figure when axs is None
+    if axs is None:
+        import matplotlib.pyplot as plt # Deferred, simulations that never plot do not pay for importing matplotlib
+        plt.figure()
+        axs = plt.gca()
+    return axs
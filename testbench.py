@@ -1,22 +1,26 @@
+import hashlib
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-import pickle
+from joblib import Parallel, delayed
 from SymbolGenerator import SymbolGenerator
 from PulseShaper import PulseShaper
-from TimingErrorDetector import TimingErrorDetector
+from TimingErrorDetector import TimingErrorDetector, TEDMethod
 
 seed = 3
-np.random.seed(seed) # Reproducibility
 
 SINGLE_RUN = True
 SINGLE_RUN_METHOD = 'mueller'
 SINGLE_RUN_SNR = 15
 
 COMPARE_RUN = False
+N_JOBS = -1 # Worker processes for the compare run, -1 uses every core
 MIN_SNR = 1
 MAX_SNR = 30
 SNR_STEP = 0.5
 
+CACHE_PULSE = True # Reuse the pulse shaped and delayed signals of a previous run with the same symbols and settings
+CACHE_DIR = "./cache"
+
 SAVE_DATA = False
 LOAD_DATA = False
 COMPARE_PLOT = False
@@ -30,96 +34,151 @@ frac_delay = 0.7 # int_delay + frac_delay = total delay in samples
 sinc_taps = 21
 upsample = 32
 is_complex = True
-
-SymbolObj = SymbolGenerator(num_symbols, sps)
-
-if SINGLE_RUN:
-    SinglePulseObj = PulseShaper(rc_taps, rolloff, sps, int_delay=int_delay, frac_delay=frac_delay, sinc_taps=sinc_taps, snr=SINGLE_RUN_SNR)
-    SinglePulseObj.pulseshaping(SymbolObj.pulse_stream)
-    SinglePulseObj.fractionaldelay()
-    SinglePulseObj.noise(is_complex=is_complex)
-
-    SingleTED = TimingErrorDetector(upsample)
-    SingleTED.interpolator(SinglePulseObj.pulse_shaped_delayed_noise)
-    SingleTED.main(len(SinglePulseObj.pulse_shaped_delayed_noise), sps, SINGLE_RUN_METHOD)
-    SingleTED.results(SymbolObj.symbol_stream, keep_all=False, print_results=True)
+dtype = np.float32 # Signal chain precision, complex signals become complex64. Roundoff is far below the simulated noise
+
+def _run_cell(noisy: np.ndarray[np.float32] | np.ndarray[np.complex64], methods: list[TEDMethod], symbol_stream: np.ndarray[np.int8], sps: int, upsample: int, dtype: type):
+    # Returns list of (perc_correct, ber, final_offset), one per method, for one SNR of the compare run
+    # Owns its TimingErrorDetector, so SNRs run independently in worker processes
+    # noisy: noisy delayed signal at this SNR
+    # methods: error equations to run on the signal
+    # symbol_stream: original sequence of symbols
+    # sps, upsample, dtype: as in the simulation settings
+    TED = TimingErrorDetector(upsample, dtype=dtype)
+    TED.set_signal(noisy) # Depends only on the noisy signal, main does not modify it, shared by all methods
+    cell = []
+    for method in methods:
+        TED.main(len(noisy), sps, method, keep_history=False) # Only the decisions and final offset are used
+        cell.append(TED.results(symbol_stream, keep_all=False))
+    return cell
+
+def _save_atomic(path: str, array: np.ndarray):
+    # Saves array as .npy at path through a temporary file in the same directory, so an interrupted run never leaves a truncated file at path
+    # path: final file path
+    # array: array to save
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f: # File object, np.save would otherwise append .npy to the temporary name
+        np.save(f, array)
+    os.replace(tmp_path, path) # Atomic rename on the same filesystem
+
+def _shape_and_delay(pulse: PulseShaper, symbol_stream: np.ndarray[np.int8]):
+    # Sets pulse.pulse_shaped and pulse.pulse_shaped_delayed, memory mapped from CACHE_DIR when a previous run already computed them
+    # Keyed by a hash of the symbols and every setting the chain depends on, so a stale file is never picked up
+    # pulse: PulseShaper to fill, its own settings key the cache
+    # symbol_stream: sequence of symbols to pulse shape
+    if not CACHE_PULSE:
+        pulse.pulseshaping(symbol_stream)
+        pulse.fractionaldelay()
+        return
+
+    key = hashlib.sha1(repr((pulse.sps, pulse.rc_taps, pulse.rolloff, pulse.int_delay, pulse.frac_delay, pulse.sinc_taps, pulse.dtype.name)).encode() + symbol_stream.tobytes()).hexdigest() # Settings of the PulseShaper being filled, not the module settings
+    shaped_path = os.path.join(CACHE_DIR, f"{key}_shaped.npy")
+    delayed_path = os.path.join(CACHE_DIR, f"{key}_delayed.npy")
+    if os.path.exists(shaped_path) and os.path.exists(delayed_path):
+        pulse.pulse_shaped = np.load(shaped_path, mmap_mode='r') # Read-only, paged in on use
+        pulse.pulse_shaped_delayed = np.load(delayed_path, mmap_mode='r')
+    else:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _save_atomic(shaped_path, pulse.pulseshaping(symbol_stream))
+        _save_atomic(delayed_path, pulse.fractionaldelay()) # Written last, its existence means both files are complete
+
+def main():
+    # Runs the modes selected by the settings above. Kept out of module level so worker processes can import this file without side effects
+    rng = np.random.default_rng(seed) # Reproducibility, shared by the symbol and noise generators
+    SymbolObj = SymbolGenerator(num_symbols, sps, rng=rng)
+
+    if SINGLE_RUN:
+        SinglePulseObj = PulseShaper(rc_taps, rolloff, sps, int_delay=int_delay, frac_delay=frac_delay, sinc_taps=sinc_taps, snr=SINGLE_RUN_SNR, rng=rng, dtype=dtype)
+        _shape_and_delay(SinglePulseObj, SymbolObj.symbol_stream)
+        SinglePulseObj.noise(is_complex=is_complex)
+
+        SingleTED = TimingErrorDetector(upsample, dtype=dtype)
+        SingleTED.set_signal(SinglePulseObj.pulse_shaped_delayed_noise)
+        SingleTED.main(len(SinglePulseObj.pulse_shaped_delayed_noise), sps, SINGLE_RUN_METHOD)
+        SingleTED.results(SymbolObj.symbol_stream, keep_all=False, print_results=True)
     
-    SinglePulseObj.plot_rc()
-    SingleTED.plot_interpolated(start_idx = 0, end_idx = 9600, is_complex=False, original=SinglePulseObj.pulse_shaped_delayed_noise)
-    SingleTED.plot_final_constellation(SINGLE_RUN_METHOD, keep_all=False)
-    SingleTED.plot_offset(SINGLE_RUN_METHOD, sps)
-
-    fig, axs = plt.subplots(2,2)
-    SymbolObj.plot_symbols(start_idx = 0, end_idx = 300, axs = axs[0,0])
-    SinglePulseObj.plot_pulse_shaped(start_idx = 0, end_idx = 300, axs = axs[0,1])
-    SinglePulseObj.plot_pulse_delayed(start_idx = 0, end_idx = 300, with_original=True, axs = axs[1,0])
-    SinglePulseObj.plot_pulse_noisy(start_idx = 0, end_idx = 300, is_complex=is_complex, axs = axs[1,1])
+        LONG = slice(0, 9600) # Plot windows, interpolated samples for LONG and samples for SHORT. Plotters slice views, nothing is copied
+        SHORT = slice(0, 300)
+
+        SinglePulseObj.plot_rc()
+        SingleTED.plot_interpolated(start_idx = LONG.start, end_idx = LONG.stop, is_complex=False, original=SinglePulseObj.pulse_shaped_delayed_noise)
+        SingleTED.plot_final_constellation(SINGLE_RUN_METHOD, keep_all=False)
+        SingleTED.plot_offset(SINGLE_RUN_METHOD, sps)
+
+        import matplotlib.pyplot as plt # Only imported by the modes that plot
+        fig, axs = plt.subplots(2,2)
+        SymbolObj.plot_symbols(start_idx = SHORT.start, end_idx = SHORT.stop, axs = axs[0,0])
+        SinglePulseObj.plot_pulse_shaped(start_idx = SHORT.start, end_idx = SHORT.stop, axs = axs[0,1])
+        SinglePulseObj.plot_pulse_delayed(start_idx = SHORT.start, end_idx = SHORT.stop, with_original=True, axs = axs[1,0])
+        SinglePulseObj.plot_pulse_noisy(start_idx = SHORT.start, end_idx = SHORT.stop, is_complex=is_complex, axs = axs[1,1])
     
-    plt.show()
-
-if COMPARE_RUN:
-    methods = ['mueller', 'gardner', 'earlylategate']
-    method_ber = {m: [] for m in methods}
-    method_perc_correct = {m: [] for m in methods}
-    method_final_offset = {m: [] for m in methods}
-    snr_test = np.arange(MIN_SNR, MAX_SNR + 1, SNR_STEP)
+        plt.show()
+
+    if COMPARE_RUN:
+        methods = ['mueller', 'gardner', 'earlylategate']
+        method_ids = [TEDMethod[m.upper()] for m in methods] # Resolved once, names are kept for the saved results and legend
+        snr_test = np.arange(MIN_SNR, MAX_SNR + 1, SNR_STEP)
+        ber_arr = np.empty((len(methods), len(snr_test))) # Row per method, column per SNR
+        perc_correct_arr = np.empty((len(methods), len(snr_test)))
+        final_offset_arr = np.empty((len(methods), len(snr_test)))
     
-    PulseObj = PulseShaper(rc_taps, rolloff, sps, int_delay=int_delay, frac_delay=frac_delay, sinc_taps=sinc_taps)
-    PulseObj.pulseshaping(SymbolObj.pulse_stream)
-    PulseObj.fractionaldelay()
-    TED = TimingErrorDetector(upsample)
-
-    iterations = len(methods) * len(snr_test)
-    cur_iter = 0
-    for snr in snr_test:
-        PulseObj.snr = snr
-        PulseObj.noise(is_complex=is_complex)
-
-        for method in methods:
-            cur_iter += 1
-            print(f"Current Iteration: {cur_iter}/{iterations}")
-            TED.interpolator(PulseObj.pulse_shaped_delayed_noise)
-            TED.main(len(PulseObj.pulse_shaped_delayed_noise), sps, method)
-            perc_correct, ber, final_offset = TED.results(SymbolObj.symbol_stream, keep_all=False)
-            method_ber[method].append(ber)
-            method_perc_correct[method].append(perc_correct)
-            method_final_offset[method].append(final_offset)
-
-if SAVE_DATA:
-    parameters = {'seed': seed,
-                  'num_symbols': num_symbols,
-                  'sps': sps,
-                  'rc_taps': rc_taps,
-                  'rolloff': rolloff,
-                  'int_delay': int_delay,
-                  'frac_delay': frac_delay,
-                  'sinc_taps': sinc_taps,
-                  'upsample': upsample,
-                  'is_complex': is_complex,
-                  'snr': snr_test
-                  }
-
-    results_dict = {'parameters': parameters,
-                    'ber': method_ber,
-                    'perc_correct': method_perc_correct,
-                    'final_offset': method_final_offset
-                    }
-
-    with open("./results_dict.pkl", "wb") as f:
-        pickle.dump(results_dict, f)
-
-if LOAD_DATA:
-    with open("./results_dict.pkl", "rb") as f:
-        results_dict = pickle.load(f)
-    method_ber = results_dict['ber']
-    snr_test = results_dict['parameters']['snr']
-
-if COMPARE_PLOT:
-    plt.figure()
-    for key, val in method_ber.items():
-        plt.plot(snr_test, val, '--', label=key)
-    plt.legend()
-    plt.xlabel('SNR (dB)')
-    plt.ylabel('BER (%)')
-    plt.title('Bit Error Rate (BER) vs. Signal-to-Noise Ratio (SNR)')
-    plt.show()
\ No newline at end of file
+        PulseObj = PulseShaper(rc_taps, rolloff, sps, int_delay=int_delay, frac_delay=frac_delay, sinc_taps=sinc_taps, rng=rng, dtype=dtype)
+        _shape_and_delay(PulseObj, SymbolObj.symbol_stream)
+        TimingErrorDetector(upsample, dtype=dtype).warmup(sps, is_complex=is_complex) # JIT compile outside of the sweep, workers load the kernels from the on-disk cache
+
+        # Noise is drawn in order here, so results match a serial run. Workers get their own copy of each noisy signal, no shared buffer
+        # max_nbytes=None pickles the signals instead of memory mapping them read-only, which would need kernels the warmup did not compile
+        cells = Parallel(n_jobs=N_JOBS, max_nbytes=None, verbose=10)(delayed(_run_cell)(noisy, method_ids, SymbolObj.symbol_stream, sps, upsample, dtype) for noisy in PulseObj.noise_sweep(snr_test, is_complex=is_complex)) # Signal power and per SNR noise std computed once for the whole sweep
+        for s_i, cell in enumerate(cells):
+            for m_i, (perc_correct, ber, final_offset) in enumerate(cell):
+                ber_arr[m_i, s_i] = ber
+                perc_correct_arr[m_i, s_i] = perc_correct
+                final_offset_arr[m_i, s_i] = final_offset
+        method_ber = dict(zip(methods, ber_arr)) # Row views, plotted and saved without conversion
+        method_perc_correct = dict(zip(methods, perc_correct_arr))
+        method_final_offset = dict(zip(methods, final_offset_arr))
+
+    if SAVE_DATA:
+        import pickle # Only imported when saving or loading results
+        parameters = {'seed': seed,
+                      'num_symbols': num_symbols,
+                      'sps': sps,
+                      'rc_taps': rc_taps,
+                      'rolloff': rolloff,
+                      'int_delay': int_delay,
+                      'frac_delay': frac_delay,
+                      'sinc_taps': sinc_taps,
+                      'upsample': upsample,
+                      'is_complex': is_complex,
+                      'dtype': np.dtype(dtype).name,
+                      'snr': snr_test
+                      }
+
+        results_dict = {'parameters': parameters,
+                        'ber': method_ber,
+                        'perc_correct': method_perc_correct,
+                        'final_offset': method_final_offset
+                        }
+
+        with open("./results_dict.pkl", "wb") as f:
+            pickle.dump(results_dict, f)
+
+    if LOAD_DATA:
+        import pickle
+        with open("./results_dict.pkl", "rb") as f:
+            results_dict = pickle.load(f)
+        method_ber = results_dict['ber']
+        snr_test = results_dict['parameters']['snr']
+
+    if COMPARE_PLOT:
+        import matplotlib.pyplot as plt
+        plt.figure()
+        for key, val in method_ber.items():
+            plt.plot(snr_test, val, '--', label=key)
+        plt.legend()
+        plt.xlabel('SNR (dB)')
+        plt.ylabel('BER (%)')
+        plt.title('Bit Error Rate (BER) vs. Signal-to-Noise Ratio (SNR)')
+        plt.show()
+
+if __name__ == "__main__":
+    main()